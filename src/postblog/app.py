@@ -21,6 +21,7 @@ from postblog.services.draft_service import DraftService
 from postblog.services.hearing_service import HearingService
 from postblog.services.history_service import HistoryService
 from postblog.services.publish_service import PublishService
+from postblog.services.summary_cache import SummaryCache
 
 
 logger = logging.getLogger(__name__)
@@ -50,7 +51,9 @@ def main() -> None:  # pragma: no cover
 
     # Services
     article_service = ArticleService(llm_client)
-    hearing_service = HearingService(llm_client)
+    hearing_service = HearingService(
+        llm_client, summary_cache=SummaryCache(), stream_summary=True
+    )
     draft_service = DraftService(draft_repo)
     publish_service = PublishService()
     history_service = HistoryService(history_repo)
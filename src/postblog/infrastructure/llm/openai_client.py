@@ -84,9 +84,13 @@ class OpenAIClient(LLMClient):
             stream=True,
         )
 
-        async for chunk in stream:  # type: ignore[union-attr]
-            if chunk.choices and chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        try:
+            async for chunk in stream:  # type: ignore[union-attr]
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # 呼び出し側が途中で受信を打ち切った場合もHTTPレスポンスを閉じる
+            await stream.close()  # type: ignore[union-attr]
 
     async def test_connection(self) -> bool:
         """接続テストを実行する。
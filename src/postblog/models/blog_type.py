@@ -1,6 +1,7 @@
 """ブログ種別のデータモデル。"""
 
 from dataclasses import dataclass, field
+from functools import cached_property
 
 
 @dataclass(frozen=True)
@@ -43,3 +44,16 @@ class BlogType:
     hearing_items: tuple[HearingItem, ...] = field(default_factory=tuple)
     system_prompt: str = ""
     article_template: str = ""
+
+    @cached_property
+    def formatted_hearing_items(self) -> str:
+        """プロンプト埋め込み用に整形したヒアリング項目。
+
+        hearing_itemsは不変のため、初回アクセス時に生成した文字列を再利用する。
+        """
+        return "\n".join(
+            [
+                f"- {item.question}（{'必須' if item.required else '任意'}）"
+                for item in self.hearing_items
+            ]
+        )
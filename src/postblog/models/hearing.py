@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class HearingMessage:
     """ヒアリングチャットの1メッセージ。
 
@@ -42,3 +42,8 @@ class HearingResult:
     seo_search_intent: str = ""
     summary: str = ""
     completed: bool = False
+    # LLM送信用メッセージリスト（HearingServiceがターンごとに追記する）。
+    # messagesの変更は追記のみを想定し、既存メッセージの編集は反映されない
+    _message_dicts: list[dict[str, str]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
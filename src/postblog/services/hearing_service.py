@@ -3,18 +3,81 @@
 LLMを使用したインタラクティブなヒアリングフローを管理する。
 """
 
-import json
+import asyncio
+import contextlib
+import hashlib
 import logging
 import re
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Any
+
+import orjson
 
 from postblog.infrastructure.llm.base import LLMClient
 from postblog.models.blog_type import BlogType
 from postblog.models.hearing import HearingMessage, HearingResult
+from postblog.services.summary_cache import SummaryCache
 from postblog.templates.prompts import HEARING_SUMMARY_PROMPT, HEARING_SYSTEM_PROMPT
 
 
 logger = logging.getLogger(__name__)
 
+# 応答キャッシュの対象とする履歴の最大件数（ユーザー発言2回分まで）
+TURN_CACHE_MAX_HISTORY = 3
+TURN_CACHE_MAX_SIZE = 1024
+TURN_CACHE_TTL_SECONDS = 3600.0
+SUMMARY_TEMPERATURE = 0.3
+# LLMへの同時リクエスト数の上限
+DEFAULT_LLM_CONCURRENCY = 8
+
+_CODE_BLOCK_RE = re.compile(r"```(?:json)?\s*\n?(.*?)\n?```", re.DOTALL)
+
+
+def _iter_json_objects(text: str) -> Iterator[tuple[int, str]]:
+    """テキスト中の括弧の対応が取れた { ... } ブロックを出現順に返す。
+
+    文字列リテラル内の括弧とエスケープを考慮し、1回の走査で各 { に対応する }
+    を求める。閉じていない { は読み飛ばし、返したブロックの内側にあるブロックは
+    返さない。
+
+    Args:
+        text: 走査対象のテキスト。
+
+    Yields:
+        ブロックの開始位置とブロック文字列のタプル。
+    """
+    begin = text.find("{")
+    if begin == -1:
+        return
+
+    ends: dict[int, int] = {}
+    open_positions: list[int] = []
+    in_string = False
+    escaped = False
+    for index in range(begin, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            open_positions.append(index)
+        elif char == "}" and open_positions:
+            ends[open_positions.pop()] = index
+
+    last_end = -1
+    for start in sorted(ends):
+        if start > last_end:
+            last_end = ends[start]
+            yield start, text[start : last_end + 1]
+
 
 def _extract_json(text: str) -> dict[str, str]:
     """LLM応答テキストからJSONオブジェクトを抽出する。
@@ -31,40 +94,176 @@ def _extract_json(text: str) -> dict[str, str]:
     Raises:
         ValueError: JSONの抽出に失敗した場合。
     """
-    # 1. コードブロックからJSON抽出を試みる
-    code_block_match = re.search(r"```(?:json)?\s*\n?(.*?)\n?```", text, re.DOTALL)
-    if code_block_match:
+    # 1. テキスト全体をJSONとしてパースを試みる（正規表現を使わない高速パス）
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
         try:
-            return json.loads(code_block_match.group(1).strip())
-        except (json.JSONDecodeError, TypeError):
+            return orjson.loads(stripped)
+        except (orjson.JSONDecodeError, TypeError):
             pass
 
-    # 2. テキスト全体をJSONとしてパースを試みる
-    try:
-        return json.loads(text.strip())
-    except (json.JSONDecodeError, TypeError):
-        pass
+    # 2. コードブロックからJSON抽出を試みる（``` を含まない場合は正規表現を省略）
+    code_block_match = _CODE_BLOCK_RE.search(text) if "```" in text else None
+    if code_block_match:
+        try:
+            return orjson.loads(code_block_match.group(1).strip())
+        except (orjson.JSONDecodeError, TypeError):
+            pass
 
-    # 3. テキスト中の最初の { ... } ブロックを抽出して試みる
-    brace_match = re.search(r"\{.*\}", text, re.DOTALL)
-    if brace_match:
+    # 3. テキスト中の括弧の対応が取れた { ... } ブロックを先頭から順に試みる
+    # 失敗したブロックの内側（ネストしたオブジェクト）は単独では試さない
+    for _start, candidate in _iter_json_objects(text):
         try:
-            return json.loads(brace_match.group(0))
-        except (json.JSONDecodeError, TypeError):
+            return orjson.loads(candidate)
+        except (orjson.JSONDecodeError, TypeError):
             pass
 
     raise ValueError("JSONの抽出に失敗しました")
 
 
+def _extract_settled_json(text: str) -> dict[str, Any] | None:
+    """受信途中のテキストから、以降の受信内容によらず確定するJSONを抽出する。
+
+    応答全体に対する_extract_jsonと同じ結果になる場合に限り辞書を返す。
+
+    - ``` を含まずテキストが { で始まる場合は、先頭のブロック
+    - テキストが { で始まらずコードブロックが閉じている場合は、最初のコードブロック
+
+    コードブロックが開いたまま（``` が奇数個）の場合や、前置きの説明文の後に
+    コードブロックなしで現れたブロックは、後続のコードブロックが優先される
+    可能性があるためNoneを返す。
+
+    Args:
+        text: 受信途中の応答テキスト。
+
+    Returns:
+        確定したJSONの辞書。確定していない場合はNone。
+    """
+    fence_count = text.count("```")
+    if fence_count % 2 == 1:
+        return None
+
+    stripped = text.lstrip()
+    candidate: str | None
+    if fence_count == 0:
+        if not stripped.startswith("{"):
+            return None
+        # 先頭の { が閉じるまでは、その内側のブロックを採用しない
+        first = next(_iter_json_objects(stripped), None)
+        candidate = first[1] if first is not None and first[0] == 0 else None
+    else:
+        if stripped.startswith("{"):
+            return None
+        code_block_match = _CODE_BLOCK_RE.search(text)
+        candidate = code_block_match.group(1).strip() if code_block_match else None
+
+    if candidate is None:
+        return None
+    try:
+        data: dict[str, Any] = orjson.loads(candidate)
+    except (orjson.JSONDecodeError, TypeError):
+        return None
+    return data
+
+
+def _turn_cache_key(blog_type_id: str, messages: list[dict[str, str]]) -> bytes:
+    """応答キャッシュのキーを生成する。
+
+    Args:
+        blog_type_id: ブログ種別ID。
+        messages: LLMに送信するメッセージリスト。
+
+    Returns:
+        キャッシュキー。
+    """
+    payload = orjson.dumps([blog_type_id, messages], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _sync_message_dicts(
+    hearing_result: HearingResult, system_prompt: str
+) -> list[dict[str, str]]:
+    """LLM送信用のメッセージリストを取得する。
+
+    ヒアリング結果に保持したリストを再利用し、ターンごとの処理を定数時間に保つ。
+    メッセージ履歴はHearingServiceが_append_message経由で追記する前提とし、
+    システムプロンプト・件数・末尾のメッセージのみを確認する。履歴の置き換えや
+    外部からの追記は検知して再構築するが、既存メッセージの内容をその場で編集した
+    場合は検知しない。
+
+    Args:
+        hearing_result: ヒアリング結果。
+        system_prompt: システムプロンプト。
+
+    Returns:
+        システムプロンプトを先頭に持つメッセージリスト。
+    """
+    message_dicts = hearing_result._message_dicts
+    messages = hearing_result.messages
+    in_sync = (
+        len(message_dicts) == len(messages) + 1
+        and message_dicts[0]["content"] is system_prompt
+        and (not messages or message_dicts[-1]["content"] is messages[-1].content)
+    )
+    if not in_sync:
+        message_dicts.clear()
+        message_dicts.append({"role": "system", "content": system_prompt})
+        message_dicts.extend(
+            {"role": msg.role, "content": msg.content}
+            for msg in hearing_result.messages
+        )
+    return message_dicts
+
+
+def _append_message(hearing_result: HearingResult, role: str, content: str) -> None:
+    """メッセージ履歴とLLM送信用リストの両方にメッセージを追加する。
+
+    Args:
+        hearing_result: ヒアリング結果。
+        role: メッセージの送信者。
+        content: メッセージ内容。
+    """
+    hearing_result.messages.append(HearingMessage(role=role, content=content))
+    hearing_result._message_dicts.append({"role": role, "content": content})
+
+
+def _apply_summary(hearing_result: HearingResult, data: dict[str, Any]) -> None:
+    """パース済みサマリーをヒアリング結果に設定する。
+
+    Args:
+        hearing_result: ヒアリング結果。
+        data: パース済みサマリーの辞書。
+    """
+    hearing_result.summary = data.get("summary", "")
+    hearing_result.answers.update(data.get("answers", {}))
+    hearing_result.seo_keywords = data.get("seo_keywords", "")
+    hearing_result.seo_target_audience = data.get("seo_target_audience", "")
+    hearing_result.seo_search_intent = data.get("seo_search_intent", "")
+
+
 class HearingService:
     """ヒアリングフローを管理するサービス。
 
     Args:
         llm_client: LLMクライアント。
+        summary_cache: サマリーキャッシュ（Noneの場合はキャッシュしない）。
+        stream_summary: サマリー生成でストリーミング応答を使用するか。
+        max_concurrency: LLMへの同時リクエスト数の上限。
     """
 
-    def __init__(self, llm_client: LLMClient) -> None:
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        summary_cache: SummaryCache | None = None,
+        stream_summary: bool = False,
+        max_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    ) -> None:
         self._llm = llm_client
+        self._llm_semaphore = asyncio.Semaphore(max_concurrency)
+        self._summary_cache = summary_cache
+        self._stream_summary = stream_summary
+        self._system_prompt_cache: dict[str, tuple[tuple[int, int], str]] = {}
+        self._turn_cache: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
 
     def start_hearing(self, blog_type: BlogType) -> HearingResult:
         """ヒアリングを開始する。
@@ -92,35 +291,94 @@ class HearingService:
         Returns:
             AIの応答テキスト。
         """
-        hearing_result.messages.append(
-            HearingMessage(role="user", content=user_message)
-        )
+        system_prompt = self._get_system_prompt(blog_type)
+
+        # システムプロンプトを先頭に固定し、可変部分は末尾に追加する
+        messages = _sync_message_dicts(hearing_result, system_prompt)
+        _append_message(hearing_result, "user", user_message)
+
+        # 序盤のターンは定型的な内容が多いため、同一履歴への応答を再利用する
+        cache_key: bytes | None = None
+        if len(hearing_result.messages) <= TURN_CACHE_MAX_HISTORY:
+            cache_key = _turn_cache_key(blog_type.id, messages)
+            cached = self._get_cached_turn(cache_key)
+            if cached is not None:
+                _append_message(hearing_result, "assistant", cached)
+                logger.debug("キャッシュ済みの応答を使用しました")
+                return cached
+
+        async with self._llm_semaphore:
+            response = await self._llm.chat(messages)
+        _append_message(hearing_result, "assistant", response)
+        if cache_key is not None:
+            self._store_turn(cache_key, response)
 
-        # ヒアリング項目の文字列生成
-        items_text = "\n".join(
-            f"- {item.question}（{'必須' if item.required else '任意'}）"
-            for item in blog_type.hearing_items
-        )
+        logger.debug("ヒアリングメッセージを送受信しました")
+        return response
 
-        system_prompt = HEARING_SYSTEM_PROMPT.format(
-            hearing_policy=blog_type.hearing_policy,
-            hearing_items=items_text,
-        )
+    def _get_cached_turn(self, key: bytes) -> str | None:
+        """キャッシュ済みの応答を取得する。
 
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(
-            {"role": msg.role, "content": msg.content}
-            for msg in hearing_result.messages
-        )
+        有効期限切れのエントリは破棄してNoneを返す。
 
-        response = await self._llm.chat(messages)
-        hearing_result.messages.append(
-            HearingMessage(role="assistant", content=response)
-        )
+        Args:
+            key: キャッシュキー。
 
-        logger.debug("ヒアリングメッセージを送受信しました")
+        Returns:
+            キャッシュ済みの応答。存在しない場合はNone。
+        """
+        entry = self._turn_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if time.monotonic() - stored_at > TURN_CACHE_TTL_SECONDS:
+            del self._turn_cache[key]
+            return None
+        self._turn_cache.move_to_end(key)
         return response
 
+    def _store_turn(self, key: bytes, response: str) -> None:
+        """応答をキャッシュに保存する。
+
+        上限を超えた場合は最も古く参照されたエントリから破棄する。
+
+        Args:
+            key: キャッシュキー。
+            response: LLMの応答。
+        """
+        self._turn_cache[key] = (time.monotonic(), response)
+        self._turn_cache.move_to_end(key)
+        while len(self._turn_cache) > TURN_CACHE_MAX_SIZE:
+            self._turn_cache.popitem(last=False)
+
+    def _get_system_prompt(self, blog_type: BlogType) -> str:
+        """ブログ種別に対応するシステムプロンプトを取得する。
+
+        プロバイダー側のプレフィックスキャッシュを有効にするため、
+        ヒアリング方針と項目が変わらない限り同一の文字列オブジェクトを返す。
+        キャッシュはブログ種別IDごとに1件のみ保持する。
+
+        Args:
+            blog_type: ブログ種別。
+
+        Returns:
+            システムプロンプト。
+        """
+        items_text = blog_type.formatted_hearing_items
+        # 文字列のハッシュ値はキャッシュされるため、2回目以降はO(1)で判定できる
+        fingerprint = (hash(blog_type.hearing_policy), hash(items_text))
+        cached = self._system_prompt_cache.get(blog_type.id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        system_prompt = HEARING_SYSTEM_PROMPT.format(
+            hearing_policy=blog_type.hearing_policy,
+            hearing_items=items_text,
+        )
+        # ヒアリング方針・項目が変わった場合は古いプロンプトを置き換える
+        self._system_prompt_cache[blog_type.id] = (fingerprint, system_prompt)
+        return system_prompt
+
     async def generate_summary(self, hearing_result: HearingResult) -> HearingResult:
         """ヒアリング結果のサマリーを生成する。
 
@@ -130,28 +388,79 @@ class HearingService:
         Returns:
             サマリーが設定されたHearingResult。
         """
+        # str.joinはリストを渡すと一度の走査で必要サイズを確定できる
         conversation = "\n".join(
-            f"{msg.role}: {msg.content}" for msg in hearing_result.messages
+            [f"{msg.role}: {msg.content}" for msg in hearing_result.messages]
         )
 
+        if self._summary_cache is not None:
+            cached = self._summary_cache.get(hearing_result.blog_type_id, conversation)
+            if cached is not None:
+                _apply_summary(hearing_result, cached)
+                hearing_result.completed = True
+                logger.info("キャッシュ済みのヒアリングサマリーを使用しました")
+                return hearing_result
+
         prompt = HEARING_SUMMARY_PROMPT.format(conversation=conversation)
         messages = [{"role": "user", "content": prompt}]
 
-        response = await self._llm.chat(messages, temperature=0.3)
+        data: dict[str, Any] | None = None
+        async with self._llm_semaphore:
+            if self._stream_summary:
+                response, data = await self._receive_summary_stream(messages)
+            else:
+                response = await self._llm.chat(
+                    messages, temperature=SUMMARY_TEMPERATURE
+                )
 
-        try:
-            data = _extract_json(response)
-            hearing_result.summary = data.get("summary", "")
-            hearing_result.answers.update(data.get("answers", {}))
-            hearing_result.seo_keywords = data.get("seo_keywords", "")
-            hearing_result.seo_target_audience = data.get("seo_target_audience", "")
-            hearing_result.seo_search_intent = data.get("seo_search_intent", "")
-        except ValueError:
+        if data is None:
+            with contextlib.suppress(ValueError):
+                data = _extract_json(response)
+
+        if data is None:
             logger.warning(
                 "サマリーのパースに失敗しました。応答全文をサマリーとして使用します。"
             )
             hearing_result.summary = response
+        else:
+            _apply_summary(hearing_result, data)
+            # パースに成功した応答のみキャッシュする
+            if self._summary_cache is not None:
+                self._summary_cache.put(hearing_result.blog_type_id, conversation, data)
 
         hearing_result.completed = True
         logger.info("ヒアリングサマリーを生成しました")
         return hearing_result
+
+    async def _receive_summary_stream(
+        self, messages: list[dict[str, str]]
+    ) -> tuple[str, dict[str, Any] | None]:
+        """サマリー応答をストリーミングで受信する。
+
+        チャンク受信中に、応答全体を受信した場合と同じ結果になることが確定した
+        JSONが現れた時点で残りの受信を打ち切る。
+
+        Args:
+            messages: LLMに送信するメッセージリスト。
+
+        Returns:
+            受信した応答テキストと、パースに成功した場合はその辞書のタプル。
+        """
+        chunks: list[str] = []
+        stream = self._llm.chat_stream(messages, temperature=SUMMARY_TEMPERATURE)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if "}" not in chunk and "`" not in chunk:
+                    continue
+                text = "".join(chunks)
+                data = _extract_settled_json(text)
+                if data is None:
+                    continue
+                logger.debug("サマリーJSONの受信が完了したため受信を打ち切ります")
+                return text, data
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return "".join(chunks), None
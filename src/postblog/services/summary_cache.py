@@ -0,0 +1,80 @@
+"""ヒアリングサマリーのキャッシュ。
+
+同一内容のヒアリング会話に対するサマリー生成のLLM呼び出しを省略する。
+"""
+
+import copy
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class SummaryCache:
+    """パース済みサマリーをメモリ上に保持するキャッシュ。
+
+    キーはブログ種別IDと会話文字列のハッシュ。会話文字列はメッセージ履歴から
+    決定的に生成されるため、完全一致の場合のみヒットする。
+    上限を超えた場合は最も古く参照されたエントリから破棄する。
+
+    Args:
+        max_entries: 保持する最大エントリ数。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, bytes], dict[str, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, blog_type_id: str, conversation: str) -> dict[str, Any] | None:
+        """キャッシュ済みのサマリーを取得する。
+
+        Args:
+            blog_type_id: ブログ種別ID。
+            conversation: 会話文字列。
+
+        Returns:
+            パース済みサマリーの辞書のコピー。存在しない場合はNone。
+        """
+        key = self._key(blog_type_id, conversation)
+        data = self._entries.get(key)
+        if data is None:
+            return None
+        self._entries.move_to_end(key)
+        logger.debug("サマリーキャッシュにヒットしました: blog_type=%s", blog_type_id)
+        return copy.deepcopy(data)
+
+    def put(self, blog_type_id: str, conversation: str, data: dict[str, Any]) -> None:
+        """サマリーをキャッシュに保存する。
+
+        Args:
+            blog_type_id: ブログ種別ID。
+            conversation: 会話文字列。
+            data: パース済みサマリーの辞書。
+        """
+        key = self._key(blog_type_id, conversation)
+        self._entries[key] = copy.deepcopy(data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _key(blog_type_id: str, conversation: str) -> tuple[str, bytes]:
+        """キャッシュキーを生成する。
+
+        Args:
+            blog_type_id: ブログ種別ID。
+            conversation: 会話文字列。
+
+        Returns:
+            キャッシュキー。
+        """
+        digest = hashlib.blake2b(conversation.encode("utf-8"), digest_size=16).digest()
+        return (blog_type_id, digest)
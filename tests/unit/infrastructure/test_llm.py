@@ -7,6 +7,19 @@ import pytest
 from postblog.infrastructure.llm.openai_client import OpenAIClient
 
 
+def _create_mock_stream(chunks: list[MagicMock]) -> MagicMock:
+    """closeを持つストリーミング応答のモックを生成する。"""
+
+    async def _aiter():
+        for chunk in chunks:
+            yield chunk
+
+    mock_stream = MagicMock()
+    mock_stream.__aiter__.side_effect = _aiter
+    mock_stream.close = AsyncMock()
+    return mock_stream
+
+
 class TestOpenAIClient:
     """OpenAIClientのテスト。"""
 
@@ -86,11 +99,7 @@ class TestOpenAIClient:
         mock_chunk3 = MagicMock()
         mock_chunk3.choices = []
 
-        async def mock_aiter(*_args, **_kwargs):
-            for chunk in [mock_chunk1, mock_chunk2, mock_chunk3]:
-                yield chunk
-
-        mock_stream = mock_aiter()
+        mock_stream = _create_mock_stream([mock_chunk1, mock_chunk2, mock_chunk3])
 
         with patch.object(
             client._client.chat.completions,
@@ -103,6 +112,32 @@ class TestOpenAIClient:
                 chunks.append(chunk)
 
         assert chunks == ["Hello", " World"]
+        mock_stream.close.assert_awaited_once()
+
+    @pytest.mark.asyncio()
+    async def test_chat_stream_closes_response_when_stopped_early(self) -> None:
+        """受信を途中で打ち切った場合にストリームが閉じられることを確認する。"""
+        client = OpenAIClient(api_key="test-key")
+
+        mock_chunks = []
+        for text in ["Hello", " World"]:
+            mock_chunk = MagicMock()
+            mock_chunk.choices = [MagicMock()]
+            mock_chunk.choices[0].delta.content = text
+            mock_chunks.append(mock_chunk)
+        mock_stream = _create_mock_stream(mock_chunks)
+
+        with patch.object(
+            client._client.chat.completions,
+            "create",
+            new_callable=AsyncMock,
+            return_value=mock_stream,
+        ):
+            stream = client.chat_stream([{"role": "user", "content": "Hi"}])
+            assert await anext(stream) == "Hello"
+            await stream.aclose()
+
+        mock_stream.close.assert_awaited_once()
 
     @pytest.mark.asyncio()
     async def test_test_connection_success(self) -> None:
@@ -132,3 +132,31 @@ class TestBlogType:
         bt2 = BlogType(id="tech", name="技術", description="d", hearing_policy="p")
 
         assert bt1 == bt2
+
+    def test_formatted_hearing_items(self) -> None:
+        """ヒアリング項目が必須・任意付きで整形されることを確認する。"""
+        items = (
+            HearingItem(
+                order=1,
+                key="topic",
+                question="テーマは？",
+                required=True,
+                description="",
+            ),
+            HearingItem(
+                order=2, key="note", question="補足は？", required=False, description=""
+            ),
+        )
+        blog_type = BlogType(
+            id="tech",
+            name="技術",
+            description="d",
+            hearing_policy="p",
+            hearing_items=items,
+        )
+
+        assert (
+            blog_type.formatted_hearing_items
+            == "- テーマは？（必須）\n- 補足は？（任意）"
+        )
+        assert blog_type.formatted_hearing_items is blog_type.formatted_hearing_items
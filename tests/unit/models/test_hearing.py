@@ -39,6 +39,11 @@ class TestHearingMessage:
         msg.content = "変更後のメッセージ"
         assert msg.content == "変更後のメッセージ"
 
+    def test_message_uses_slots(self) -> None:
+        """HearingMessageがインスタンス辞書を持たないことを確認する。"""
+        msg = HearingMessage(role="user", content="テスト")
+        assert not hasattr(msg, "__dict__")
+
 
 class TestHearingResult:
     """HearingResultのテスト。"""
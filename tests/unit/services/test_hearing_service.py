@@ -1,13 +1,23 @@
 """ヒアリングサービスのテスト。"""
 
+import asyncio
+import dataclasses
 import json
-from unittest.mock import AsyncMock
+import time
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from postblog.infrastructure.llm.base import LLMClient
-from postblog.models.hearing import HearingResult
-from postblog.services.hearing_service import HearingService, _extract_json
+from postblog.models.hearing import HearingMessage, HearingResult
+from postblog.services.hearing_service import (
+    TURN_CACHE_TTL_SECONDS,
+    HearingService,
+    _extract_json,
+    _iter_json_objects,
+)
+from postblog.services.summary_cache import SummaryCache
 from postblog.templates.hearing_templates import TECH_BLOG
 
 
@@ -18,6 +28,24 @@ def _create_mock_llm(response: str = "テスト応答") -> LLMClient:
     return mock
 
 
+def _create_streaming_mock_llm(chunks: list[str]) -> tuple[LLMClient, list[str]]:
+    """ストリーミング応答を返すモックLLMクライアントを生成する。
+
+    Returns:
+        モックLLMクライアントと、実際に送出されたチャンクのリストのタプル。
+    """
+    yielded: list[str] = []
+
+    async def _stream(*_args: object, **_kwargs: object) -> AsyncIterator[str]:
+        for chunk in chunks:
+            yielded.append(chunk)
+            yield chunk
+
+    mock = _create_mock_llm()
+    mock.chat_stream = MagicMock(side_effect=_stream)
+    return mock, yielded
+
+
 class TestHearingService:
     """HearingServiceのテスト。"""
 
@@ -60,6 +88,205 @@ class TestHearingService:
 
         assert len(hearing_result.messages) == 4
 
+    @pytest.mark.asyncio()
+    async def test_send_message_reuses_system_prompt(self) -> None:
+        """複数回の送信で同一のシステムプロンプトが先頭に送られることを確認する。"""
+        sent: list[list[dict[str, str]]] = []
+
+        async def _chat(messages: list[dict[str, str]], **_kwargs: object) -> str:
+            sent.append(list(messages))
+            return "応答"
+
+        mock_llm = _create_mock_llm()
+        mock_llm.chat = AsyncMock(side_effect=_chat)
+        service = HearingService(mock_llm)
+        hearing_result = HearingResult(blog_type_id="tech")
+
+        await service.send_message(hearing_result, "質問1", TECH_BLOG)
+        await service.send_message(hearing_result, "質問2", TECH_BLOG)
+
+        first_messages, second_messages = sent
+        assert first_messages[0]["role"] == "system"
+        assert first_messages[0]["content"] is second_messages[0]["content"]
+        assert second_messages[-1] == {"role": "user", "content": "質問2"}
+
+    @pytest.mark.asyncio()
+    async def test_send_message_rebuilds_system_prompt_on_policy_change(
+        self,
+    ) -> None:
+        """ヒアリング方針が変わった場合にシステムプロンプトが置き換わることを確認する。"""
+        mock_llm = _create_mock_llm("応答")
+        service = HearingService(mock_llm)
+        updated_blog_type = dataclasses.replace(
+            TECH_BLOG, hearing_policy="新しいヒアリング方針"
+        )
+
+        await service.send_message(
+            HearingResult(blog_type_id="tech"), "質問1", TECH_BLOG
+        )
+        await service.send_message(
+            HearingResult(blog_type_id="tech"), "質問1", updated_blog_type
+        )
+
+        first_messages = mock_llm.chat.call_args_list[0].args[0]
+        second_messages = mock_llm.chat.call_args_list[1].args[0]
+        assert "新しいヒアリング方針" not in first_messages[0]["content"]
+        assert "新しいヒアリング方針" in second_messages[0]["content"]
+        assert len(service._system_prompt_cache) == 1
+
+    @pytest.mark.asyncio()
+    async def test_send_message_reuses_message_list(self) -> None:
+        """ターン間でLLM送信用のメッセージリストが再利用されることを確認する。"""
+        mock_llm = _create_mock_llm("応答")
+        service = HearingService(mock_llm)
+        hearing_result = HearingResult(blog_type_id="tech")
+
+        await service.send_message(hearing_result, "質問1", TECH_BLOG)
+        await service.send_message(hearing_result, "質問2", TECH_BLOG)
+
+        first_messages = mock_llm.chat.call_args_list[0].args[0]
+        second_messages = mock_llm.chat.call_args_list[1].args[0]
+        assert first_messages is second_messages
+        assert [m["role"] for m in second_messages] == [
+            "system",
+            "user",
+            "assistant",
+            "user",
+            "assistant",
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_send_message_rebuilds_message_list_after_history_change(
+        self,
+    ) -> None:
+        """メッセージ履歴が外部で変更された場合に送信リストが再構築されることを確認する。"""
+        mock_llm = _create_mock_llm("応答")
+        service = HearingService(mock_llm)
+        hearing_result = HearingResult(blog_type_id="tech")
+
+        await service.send_message(hearing_result, "質問1", TECH_BLOG)
+        hearing_result.messages = [HearingMessage(role="user", content="別の質問")]
+        hearing_result.messages.append(HearingMessage(role="assistant", content="別"))
+        await service.send_message(hearing_result, "質問2", TECH_BLOG)
+
+        sent = mock_llm.chat.call_args_list[1].args[0]
+        assert [m["content"] for m in sent[1:]] == ["別の質問", "別", "質問2", "応答"]
+
+    @pytest.mark.asyncio()
+    async def test_send_message_rebuilds_message_list_after_external_append(
+        self,
+    ) -> None:
+        """メッセージが外部から追記された場合に送信リストが再構築されることを確認する。"""
+        mock_llm = _create_mock_llm("応答")
+        service = HearingService(mock_llm)
+        hearing_result = HearingResult(blog_type_id="tech")
+
+        await service.send_message(hearing_result, "質問1", TECH_BLOG)
+        hearing_result.messages.append(HearingMessage(role="user", content="追記"))
+        hearing_result.messages.append(HearingMessage(role="assistant", content="了解"))
+        await service.send_message(hearing_result, "質問2", TECH_BLOG)
+
+        sent = mock_llm.chat.call_args_list[1].args[0]
+        assert [m["content"] for m in sent[1:]] == [
+            "質問1",
+            "応答",
+            "追記",
+            "了解",
+            "質問2",
+            "応答",
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_send_message_limits_concurrency(self) -> None:
+        """LLMへの同時リクエスト数が上限を超えないことを確認する。"""
+        running = 0
+        max_running = 0
+
+        async def _chat(*_args: object, **_kwargs: object) -> str:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return "応答"
+
+        mock_llm = _create_mock_llm()
+        mock_llm.chat = AsyncMock(side_effect=_chat)
+        service = HearingService(mock_llm, max_concurrency=2)
+
+        await asyncio.gather(
+            *(
+                service.send_message(
+                    HearingResult(blog_type_id="tech"), f"質問{i}", TECH_BLOG
+                )
+                for i in range(5)
+            )
+        )
+
+        assert mock_llm.chat.await_count == 5
+        assert max_running == 2
+
+    @pytest.mark.asyncio()
+    async def test_send_message_uses_turn_cache(self) -> None:
+        """同一の序盤ターンでLLM呼び出しが省略されることを確認する。"""
+        mock_llm = _create_mock_llm("テーマについて教えてください。")
+        service = HearingService(mock_llm)
+
+        first = HearingResult(blog_type_id="tech")
+        second = HearingResult(blog_type_id="tech")
+        await service.send_message(first, "Pythonについて書きたい", TECH_BLOG)
+        response = await service.send_message(
+            second, "Pythonについて書きたい", TECH_BLOG
+        )
+
+        assert mock_llm.chat.await_count == 1
+        assert response == "テーマについて教えてください。"
+        assert len(second.messages) == 2
+        assert second.messages[1].content == "テーマについて教えてください。"
+
+    @pytest.mark.asyncio()
+    async def test_send_message_turn_cache_expires(self) -> None:
+        """有効期限切れのキャッシュが使用されないことを確認する。"""
+        mock_llm = _create_mock_llm("応答")
+        service = HearingService(mock_llm)
+
+        with patch(
+            "postblog.services.hearing_service.time.monotonic", return_value=0.0
+        ):
+            await service.send_message(
+                HearingResult(blog_type_id="tech"), "質問", TECH_BLOG
+            )
+        with patch(
+            "postblog.services.hearing_service.time.monotonic",
+            return_value=TURN_CACHE_TTL_SECONDS + 1,
+        ):
+            await service.send_message(
+                HearingResult(blog_type_id="tech"), "質問", TECH_BLOG
+            )
+
+        assert mock_llm.chat.await_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_send_message_does_not_cache_later_turns(self) -> None:
+        """序盤以降のターンはキャッシュされないことを確認する。"""
+        mock_llm = _create_mock_llm("応答")
+        service = HearingService(mock_llm)
+        history = [
+            HearingMessage(role="user", content="質問1"),
+            HearingMessage(role="assistant", content="応答1"),
+            HearingMessage(role="user", content="質問2"),
+            HearingMessage(role="assistant", content="応答2"),
+        ]
+
+        for _ in range(2):
+            await service.send_message(
+                HearingResult(blog_type_id="tech", messages=list(history)),
+                "質問3",
+                TECH_BLOG,
+            )
+
+        assert mock_llm.chat.await_count == 2
+
     @pytest.mark.asyncio()
     async def test_generate_summary_json_in_code_block(self) -> None:
         """コードブロックで囲まれたJSONサマリーが正しくパースされることを確認する。"""
@@ -113,6 +340,122 @@ class TestHearingService:
         assert result.summary == "これはJSONではありません"
         assert result.completed is True
 
+    @pytest.mark.asyncio()
+    async def test_generate_summary_uses_cache(self) -> None:
+        """同一会話のサマリー生成でLLM呼び出しが省略されることを確認する。"""
+        summary_data = {"summary": "キャッシュ対象", "seo_keywords": "Python"}
+        mock_llm = _create_mock_llm(json.dumps(summary_data))
+        service = HearingService(mock_llm, summary_cache=SummaryCache())
+        messages = [HearingMessage(role="user", content="Pythonについて")]
+
+        await service.generate_summary(
+            HearingResult(blog_type_id="tech", messages=list(messages))
+        )
+        result = await service.generate_summary(
+            HearingResult(blog_type_id="tech", messages=list(messages))
+        )
+
+        assert mock_llm.chat.await_count == 1
+        assert result.summary == "キャッシュ対象"
+        assert result.seo_keywords == "Python"
+        assert result.completed is True
+
+    @pytest.mark.asyncio()
+    async def test_generate_summary_does_not_cache_invalid_json(self) -> None:
+        """パースに失敗した応答はキャッシュされないことを確認する。"""
+        mock_llm = _create_mock_llm("これはJSONではありません")
+        service = HearingService(mock_llm, summary_cache=SummaryCache())
+
+        await service.generate_summary(HearingResult(blog_type_id="tech"))
+        await service.generate_summary(HearingResult(blog_type_id="tech"))
+
+        assert mock_llm.chat.await_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_generate_summary_stream_stops_after_json(self) -> None:
+        """ストリーミングでJSONが揃った時点で受信を打ち切ることを確認する。"""
+        chunks = [
+            '```json\n{"summary": "ストリー',
+            'ミング", "answers": {}}',
+            "\n```",
+            "後略",
+        ]
+        mock_llm, yielded = _create_streaming_mock_llm(chunks)
+        service = HearingService(mock_llm, stream_summary=True)
+
+        result = await service.generate_summary(HearingResult(blog_type_id="tech"))
+
+        assert result.summary == "ストリーミング"
+        assert result.completed is True
+        assert yielded == chunks[:3]
+        mock_llm.chat.assert_not_awaited()
+
+    @pytest.mark.asyncio()
+    async def test_generate_summary_stream_stops_after_bare_json(self) -> None:
+        """コードブロックなしのJSONが閉じた時点で受信を打ち切ることを確認する。"""
+        chunks = ['{"summary": "素の', 'JSON"}', "\n補足です。", "後略"]
+        mock_llm, yielded = _create_streaming_mock_llm(chunks)
+        service = HearingService(mock_llm, stream_summary=True)
+
+        result = await service.generate_summary(HearingResult(blog_type_id="tech"))
+
+        assert result.summary == "素のJSON"
+        assert yielded == chunks[:2]
+
+    @pytest.mark.asyncio()
+    async def test_generate_summary_stream_matches_blocking_with_preface(
+        self,
+    ) -> None:
+        """前置きの例示JSONがあってもストリーミングと一括受信で結果が一致することを確認する。"""
+        response = (
+            '出力例: {"summary": "例"}\n本体:\n```json\n'
+            '{"summary": "本物", "answers": {"topic": "Python"}}\n```'
+        )
+        chunks = [response[i : i + 8] for i in range(0, len(response), 8)]
+        streaming_llm, _ = _create_streaming_mock_llm(chunks)
+        streamed = await HearingService(
+            streaming_llm, stream_summary=True
+        ).generate_summary(HearingResult(blog_type_id="tech"))
+        blocking = await HearingService(_create_mock_llm(response)).generate_summary(
+            HearingResult(blog_type_id="tech")
+        )
+
+        assert streamed.summary == blocking.summary == "本物"
+        assert streamed.answers == blocking.answers == {"topic": "Python"}
+
+    @pytest.mark.asyncio()
+    async def test_generate_summary_stream_malformed_outer_object(self) -> None:
+        """外側のJSONが不正な場合に最後まで受信し応答全文がサマリーになることを確認する。"""
+        chunks = [
+            '{"summary": "x", ',
+            '"answers": {"topic": "Python"}',
+            ",}",
+            "\n以上です。",
+        ]
+        mock_llm, yielded = _create_streaming_mock_llm(chunks)
+        service = HearingService(
+            mock_llm, summary_cache=SummaryCache(), stream_summary=True
+        )
+
+        result = await service.generate_summary(HearingResult(blog_type_id="tech"))
+
+        assert yielded == chunks
+        assert result.summary == "".join(chunks)
+        assert result.answers == {}
+        assert result.completed is True
+
+    @pytest.mark.asyncio()
+    async def test_generate_summary_stream_invalid_json(self) -> None:
+        """ストリーミングでパースに失敗した場合に応答全文がサマリーになることを確認する。"""
+        chunks = ["これは", "{JSONでは}", "ありません"]
+        mock_llm, yielded = _create_streaming_mock_llm(chunks)
+        service = HearingService(mock_llm, stream_summary=True)
+
+        result = await service.generate_summary(HearingResult(blog_type_id="tech"))
+
+        assert result.summary == "これは{JSONでは}ありません"
+        assert yielded == chunks
+
 
 class TestExtractJson:
     """_extract_json関数のテスト。"""
@@ -122,6 +465,11 @@ class TestExtractJson:
         text = '{"key": "value"}'
         assert _extract_json(text) == {"key": "value"}
 
+    def test_extract_plain_json_containing_code_fence(self) -> None:
+        """値にコードブロック記法を含むプレーンなJSONを全体としてパースできることを確認する。"""
+        text = '{"summary": "```json\\n{}\\n``` の使い方"}'
+        assert _extract_json(text) == {"summary": "```json\n{}\n``` の使い方"}
+
     def test_extract_json_from_code_block(self) -> None:
         """マークダウンコードブロックからJSONを抽出できることを確認する。"""
         text = '```json\n{"key": "value"}\n```'
@@ -152,3 +500,71 @@ class TestExtractJson:
         """JSONが含まれない場合にValueErrorが発生することを確認する。"""
         with pytest.raises(ValueError, match="JSONの抽出に失敗しました"):
             _extract_json("これはJSONではありません")
+
+    def test_extract_json_skips_invalid_brace_block(self) -> None:
+        """不正なブレースブロックの後にある有効なJSONを抽出できることを確認する。"""
+        text = '例: {不正} 結果: {"key": "value"} 以上です。{補足}'
+        assert _extract_json(text) == {"key": "value"}
+
+    def test_extract_json_malformed_outer_object_raises(self) -> None:
+        """外側のオブジェクトが不正な場合に内側のオブジェクトを返さないことを確認する。"""
+        text = '{"summary": "x", "answers": {"topic": "Python"},}'
+        with pytest.raises(ValueError, match="JSONの抽出に失敗しました"):
+            _extract_json(text)
+
+    def test_extract_json_skips_past_failed_block(self) -> None:
+        """失敗したブロックの末尾以降から次のブロックを探すことを確認する。"""
+        text = '{"a": {"inner": 1},} 後続: {"key": "value"}'
+        assert _extract_json(text) == {"key": "value"}
+
+    def test_extract_json_skips_unmatched_leading_brace(self) -> None:
+        """閉じていない { の後にある有効なJSONを抽出できることを確認する。"""
+        text = '注意: { は使わないでください。結果: {"summary": "x"}'
+        assert _extract_json(text) == {"summary": "x"}
+
+    def test_extract_json_deeply_nested_invalid_is_fast(self) -> None:
+        """深くネストした不正ブロックでも短時間で失敗することを確認する。"""
+        text = "{" * 8000 + "}" * 8000
+        started = time.perf_counter()
+        with pytest.raises(ValueError, match="JSONの抽出に失敗しました"):
+            _extract_json(text)
+
+        assert time.perf_counter() - started < 1.0
+
+    def test_extract_json_nested_object(self) -> None:
+        """ネストしたオブジェクトを含むJSONを抽出できることを確認する。"""
+        text = '結果:\n{"answers": {"topic": "Python"}, "summary": "s"}\n以上'
+        assert _extract_json(text) == {
+            "answers": {"topic": "Python"},
+            "summary": "s",
+        }
+
+    def test_extract_json_braces_in_string(self) -> None:
+        """文字列内の括弧やエスケープを正しく扱えることを確認する。"""
+        text = '結果: {"key": "a} \\"{b\\" c"} 以上'
+        assert _extract_json(text) == {"key": 'a} "{b" c'}
+
+
+class TestIterJsonObjects:
+    """_iter_json_objects関数のテスト。"""
+
+    def test_yields_outermost_blocks_in_order(self) -> None:
+        """外側のブロックが出現順に返され、内側のブロックは返されないことを確認する。"""
+        text = 'a {"x": {"y": 1}} b {"z": 2}'
+        assert list(_iter_json_objects(text)) == [
+            (2, '{"x": {"y": 1}}'),
+            (20, '{"z": 2}'),
+        ]
+
+    def test_skips_unmatched_brace(self) -> None:
+        """閉じていない { を読み飛ばして内側のブロックを返すことを確認する。"""
+        assert list(_iter_json_objects('{"a": {"b": 1}')) == [(6, '{"b": 1}')]
+
+    def test_ignores_braces_in_string(self) -> None:
+        """文字列リテラル内の括弧を無視することを確認する。"""
+        text = '{"a": "{\\"}"}'
+        assert list(_iter_json_objects(text)) == [(0, text)]
+
+    def test_yields_nothing_without_brace(self) -> None:
+        """ブレースがない場合に何も返されないことを確認する。"""
+        assert list(_iter_json_objects("JSONなし")) == []
@@ -0,0 +1,62 @@
+"""サマリーキャッシュのテスト。"""
+
+from postblog.services.summary_cache import SummaryCache
+
+
+class TestSummaryCache:
+    """SummaryCacheのテスト。"""
+
+    def test_get_returns_none_on_miss(self) -> None:
+        """未登録の会話でNoneが返されることを確認する。"""
+        cache = SummaryCache()
+        assert cache.get("tech", "user: Python") is None
+
+    def test_put_and_get(self) -> None:
+        """保存したサマリーが取得できることを確認する。"""
+        cache = SummaryCache()
+        cache.put("tech", "user: Python", {"summary": "Python記事"})
+
+        assert cache.get("tech", "user: Python") == {"summary": "Python記事"}
+
+    def test_key_includes_blog_type(self) -> None:
+        """ブログ種別が異なる場合はヒットしないことを確認する。"""
+        cache = SummaryCache()
+        cache.put("tech", "user: Python", {"summary": "Python記事"})
+
+        assert cache.get("diary", "user: Python") is None
+
+    def test_whitespace_difference_is_distinct(self) -> None:
+        """空白のみが異なる会話が別のエントリとして扱われることを確認する。"""
+        cache = SummaryCache()
+        cache.put("tech", "user: def f():\n    return 1", {"summary": "s"})
+
+        assert cache.get("tech", "user: def f():\n  return 1") is None
+        assert cache.get("tech", "user: def f():\n\u3000return 1") is None
+
+    def test_get_returns_copy(self) -> None:
+        """取得した辞書を変更してもキャッシュに影響しないことを確認する。"""
+        cache = SummaryCache()
+        cache.put("tech", "a", {"summary": "s", "answers": {"topic": "Python"}})
+
+        data = cache.get("tech", "a")
+        assert data is not None
+        data["summary"] = "変更"
+        data["answers"]["topic"] = "変更"
+
+        assert cache.get("tech", "a") == {
+            "summary": "s",
+            "answers": {"topic": "Python"},
+        }
+
+    def test_evicts_least_recently_used(self) -> None:
+        """上限を超えた場合に最も古く参照されたエントリが破棄されることを確認する。"""
+        cache = SummaryCache(max_entries=2)
+        cache.put("tech", "a", {"summary": "a"})
+        cache.put("tech", "b", {"summary": "b"})
+        cache.get("tech", "a")
+        cache.put("tech", "c", {"summary": "c"})
+
+        assert len(cache) == 2
+        assert cache.get("tech", "a") is not None
+        assert cache.get("tech", "b") is None
+        assert cache.get("tech", "c") is not None